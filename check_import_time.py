@@ -0,0 +1,79 @@
+"""Import-time regression check for the dashboard's cold start.
+
+Imports dashboard.py in a fresh interpreter with ``python -X importtime`` and
+fails if a module that should load lazily shows up, or if the total import
+time goes over budget. Run it after touching imports:
+
+    python check_import_time.py
+    python check_import_time.py --budget-ms 2000 --top 20
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+# Modules that must only load once a chart is drawn or data is fetched.
+# Streamlit itself imports the plotly package and graph_objects shell for its
+# chart theme, so only plotly.express is checked on the plotly side.
+LAZY_MODULES = ['plotly.express', 'gspread', 'google.auth', 'google.oauth2', 'openpyxl']
+
+DEFAULT_BUDGET_MS = 2500
+
+
+def profile_imports(module='dashboard'):
+    """Return (module name, self us, cumulative us, depth) for every import"""
+    project_dir = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=project_dir,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), int(self_us), int(cumulative_us), depth))
+
+    return imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check dashboard cold-start import time")
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS, help="Maximum total import time")
+    parser.add_argument('--top', type=int, default=15, help="Number of slowest imports to list")
+    args = parser.parse_args()
+
+    imports = profile_imports()
+    total_ms = sum(cumulative for _, _, cumulative, depth in imports if depth == 0) / 1000
+
+    print(f"Total import time: {total_ms:,.0f} ms (budget {args.budget_ms:,.0f} ms)")
+    print("Slowest imports:")
+    for name, _, cumulative, _ in sorted(imports, key=lambda item: item[2], reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    eager = sorted({
+        name for name, _, _, _ in imports
+        if any(name == lazy or name.startswith(f"{lazy}.") for lazy in LAZY_MODULES)
+    })
+
+    failed = False
+    if eager:
+        print(f"\n❌ Imported at startup but should be lazy: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"\n❌ Import time {total_ms:,.0f} ms is over the {args.budget_ms:,.0f} ms budget")
+        failed = True
+    if not failed:
+        print("\n✅ Cold start import check passed")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
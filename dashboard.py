@@ -1,8 +1,13 @@
+import os
+import re
 import streamlit as st
 import pandas as pd
-from datetime import datetime, timedelta
-from sheets_connector import SheetsConnector
-from data_processor import DataProcessor
+from datetime import date, datetime, timedelta
+from data_source import create_data_source
+from data_processor import DataProcessor, COMPARISON_DIMENSIONS
+from search_index import SearchIndex
+from geocoder import Geocoder
+from write_queue import WriteQueue
 
 # Configure Streamlit page
 st.set_page_config(
@@ -13,97 +18,37 @@ st.set_page_config(
 )
 
 # Custom CSS for better styling and readability
-st.markdown("""
-<style>
-    /* Improve metric card readability */
-    .metric-card {
-        background-color: #ffffff;
-        padding: 1.5rem;
-        border-radius: 0.75rem;
-        border: 2px solid #e1e5e9;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-    }
-    
-    /* Better contrast for metric labels */
-    .stMetric > label {
-        font-size: 16px !important;
-        color: #1f1f1f !important;
-        font-weight: 700 !important;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-    }
-    
-    /* Stronger text for metric values */
-    .stMetric > div {
-        font-size: 28px !important;
-        font-weight: 800 !important;
-        color: #0f1419 !important;
-    }
-    
-    /* Improve sidebar text */
-    .css-1d391kg {
-        color: #1f1f1f !important;
-    }
-    
-    /* Better button contrast */
-    .stButton > button {
-        background-color: #0066cc;
-        color: white;
-        font-weight: 600;
-        border: none;
-        border-radius: 0.5rem;
-    }
-    
-    /* Improve dataframe text */
-    .stDataFrame {
-        background-color: white;
-    }
-    
-    /* Better chart backgrounds */
-    .plotly-graph-div {
-        background-color: white !important;
-    }
+CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "dashboard.css")
 
-    /* Timed sidebar notification cards */
-    .timed-notice {
-        padding: 0.75rem 0.9rem;
-        border-radius: 0.5rem;
-        margin: 0.35rem 0;
-        font-size: 0.95rem;
-        max-height: 80px;
-        overflow: hidden;
-        animation: fadeOutNotice 5s forwards, collapseNotice 0s linear 5s forwards;
-    }
+@st.cache_resource(show_spinner=False)
+def load_css():
+    """Read and minify the stylesheet once per server process"""
+    with open(CSS_PATH, "r", encoding="utf-8") as f:
+        css = f.read()
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{}:;,])\s*", r"\1", css)
+    return f"<style>{css.strip()}</style>"
 
-    .timed-notice.success {
-        background: #e8f7ee;
-        color: #146c43;
-        border: 1px solid #bfe6cd;
-    }
+# Streamlit drops elements a rerun doesn't emit, so the cached tag is sent every run
+st.markdown(load_css(), unsafe_allow_html=True)
 
-    .timed-notice.info {
-        background: #e8f2ff;
-        color: #0b5394;
-        border: 1px solid #c7dcfb;
-    }
+# Map cluster sizes in degrees of latitude/longitude
+MAP_CLUSTER_SIZES = {
+    "City": 0.25,
+    "Region": 2.0,
+    "Country": 6.0
+}
 
-    @keyframes fadeOutNotice {
-        0% { opacity: 1; }
-        85% { opacity: 1; }
-        100% { opacity: 0; }
-    }
+@st.cache_resource
+def get_geocoder():
+    """Share one geocoder (and its in-memory cache) across sessions"""
+    return Geocoder()
 
-    @keyframes collapseNotice {
-        to {
-            max-height: 0;
-            margin: 0;
-            padding-top: 0;
-            padding-bottom: 0;
-            border-width: 0;
-        }
-    }
-</style>
-""", unsafe_allow_html=True)
+@st.cache_resource
+def get_write_queue():
+    """Share one persisted write queue so every session saves the same pending batch"""
+    return WriteQueue()
 
 def main():
     # Header
@@ -119,6 +64,12 @@ def main():
         st.session_state.load_notice_expires_at = 0.0
     if 'last_loaded_count' not in st.session_state:
         st.session_state.last_loaded_count = 0
+    if 'search_index' not in st.session_state:
+        st.session_state.search_index = None
+    if 'source_name' not in st.session_state:
+        st.session_state.source_name = ""
+    if 'data_source' not in st.session_state:
+        st.session_state.data_source = None
     
     # Sidebar for controls
     st.sidebar.header("🔧 Controls")
@@ -127,13 +78,27 @@ def main():
     st.sidebar.subheader("📊 Data Connection")
     
     if st.sidebar.button("🔄 Load/Refresh Data", type="primary"):
-        with st.spinner("Loading data from Google Sheets..."):
-            connector = SheetsConnector()
-            df = connector.load_data()
+        source = create_data_source()
+        with st.spinner(f"Loading data from {source.name if source else 'data source'}..."):
+            df = source.load_data() if source else None
             
             if df is not None and not df.empty:
+                # Expenses still waiting in the queue aren't in the sheet yet; keep showing them.
+                # A read-only source can never save or clear them, so leave them out there.
+                queue = get_write_queue()
+                if source.supports_writes and len(queue):
+                    df = pd.concat([df, build_transaction_rows(source, df, queue.pending)], ignore_index=True)
+                
                 st.session_state.df = df
                 st.session_state.data_loaded = True
+                st.session_state.source_name = source.name
+                st.session_state.data_source = source
+
+                # Build the search index once per dataset; reloads only tokenize appended rows.
+                if st.session_state.search_index is None:
+                    st.session_state.search_index = SearchIndex(df)
+                else:
+                    st.session_state.search_index.sync(df)
                 st.session_state.last_loaded_count = len(df)
                 st.session_state.load_notice_expires_at = datetime.now().timestamp() + 5
             else:
@@ -148,7 +113,7 @@ def main():
             unsafe_allow_html=True
         )
         st.sidebar.markdown(
-            "<div class='timed-notice success'>🟢 Connected to Google Sheets</div>",
+            f"<div class='timed-notice success'>🟢 Connected to {st.session_state.source_name}</div>",
             unsafe_allow_html=True
         )
         st.sidebar.markdown(
@@ -161,9 +126,21 @@ def main():
         pass
     else:
         st.sidebar.warning("🟡 No data loaded")
-        st.info("👆 Click 'Load/Refresh Data' in the sidebar to connect to your Google Sheets")
+        st.info("👆 Click 'Load/Refresh Data' in the sidebar to connect to your data source")
         return
     
+    # Write-back to the source, when it supports it
+    source = st.session_state.data_source
+    if source is not None and source.supports_writes:
+        # Handle the entry form first so the pending panel reflects a just-added expense
+        display_entry_form(st.session_state.df)
+        
+        queue = get_write_queue()
+        # Poll only while a backed-off retry is scheduled
+        pending_panel = st.fragment(display_pending_writes, run_every=5 if queue.next_attempt_at else None)
+        with st.sidebar:
+            pending_panel()
+    
     # Data filtering section
     if st.session_state.data_loaded and not st.session_state.df.empty:
         df = st.session_state.df
@@ -171,6 +148,16 @@ def main():
         
         st.sidebar.subheader("🔍 Filters")
         
+        # Full-text search
+        search_query = st.sidebar.text_input(
+            "🔎 Search",
+            placeholder="Merchant, notes, location...",
+            help="Matches words starting with each search term across all text columns"
+        ).strip()
+        search_result = None
+        if search_query:
+            search_result = st.session_state.search_index.search(search_query)
+        
         # Date range filter
         if 'Date' in df.columns and not df['Date'].isna().all():
             min_date = df['Date'].min().date()
@@ -212,16 +199,214 @@ def main():
         else:
             selected_trips = None
         
+        # Comparison mode
+        st.sidebar.subheader("⚖️ Compare")
+        compare_mode = st.sidebar.selectbox(
+            "Comparison Mode",
+            options=["Off"] + COMPARISON_DIMENSIONS,
+            help="Compare two trips, years, or date ranges side by side"
+        )
+        comparison_sides = select_comparison_sides(df, compare_mode, start_date, end_date)
+        
         # Apply filters
         filtered_processor = processor.filter_data(
             start_date=pd.Timestamp(start_date) if start_date else None,
             end_date=pd.Timestamp(end_date) if end_date else None,
             categories=selected_categories if selected_categories else None,
-            trips=selected_trips if selected_trips else None
+            trips=selected_trips if selected_trips else None,
+            rows=search_result['rows'] if search_result else None
         )
         
+        if search_result:
+            display_search_facets(search_query, search_result)
+        
         # Main dashboard content
-        display_dashboard(filtered_processor)
+        if comparison_sides:
+            display_comparison(filtered_processor, compare_mode, *comparison_sides)
+        else:
+            display_dashboard(filtered_processor)
+
+def build_transaction_rows(source, df, transactions):
+    """Clean new transactions the same way as loaded data, aligned to the cached frame"""
+    rows = source.clean_data(pd.DataFrame(transactions))
+    return rows.reindex(columns=df.columns)
+
+def display_entry_form(df):
+    """Form for entering expenses into the local write queue"""
+    with st.expander("➕ Add Expenses", expanded=False):
+        categories = df['Category'].dropna().unique().tolist() if 'Category' in df.columns else []
+        last_trip = ""
+        if 'Trip Name' in df.columns and not df['Trip Name'].dropna().empty:
+            last_trip = str(df['Trip Name'].dropna().iloc[-1])
+        
+        with st.form("expense_entry", clear_on_submit=True):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                trip_name = st.text_input("✈️ Trip Name", value=last_trip)
+                merchant = st.text_input("🏪 Merchant")
+                cost = st.number_input("💰 Cost", min_value=0.0, step=1.0, format="%.2f")
+            with col2:
+                if categories:
+                    category = st.selectbox("🏷️ Category", options=categories)
+                    # Form widgets can't rerun on change, so the free-text field is always shown
+                    new_category = st.text_input("🆕 New Category", placeholder="Leave blank to use the category above")
+                else:
+                    category = None
+                    new_category = st.text_input("🏷️ Category")
+                location = st.text_input("📍 Location")
+                point_spend = st.number_input("🪙 Point Spend", min_value=0, step=1000)
+            with col3:
+                entry_date = st.date_input("📅 Date", value=date.today())
+                notes = st.text_input("📝 Notes")
+                point_value = st.number_input("💎 Point Cash Value", min_value=0.0, step=1.0, format="%.2f")
+            
+            submitted = st.form_submit_button("➕ Add to Batch")
+        
+        if submitted:
+            category = new_category.strip() or category
+            if not trip_name or not category:
+                st.error("❌ Trip Name and Category are required")
+                return
+            
+            transaction = {
+                'Trip Name': trip_name.strip(),
+                'Category': category,
+                'Date': pd.Timestamp(entry_date),
+                'Merchant': merchant.strip(),
+                'Cost': cost,
+                'Point Spend': point_spend,
+                'Notes': notes.strip(),
+                'Location': location.strip(),
+                'Point Cash Value': point_value
+            }
+            queue = get_write_queue()
+            queue.add(transaction)
+            
+            # Apply optimistically so charts update now; the sheet catches up on save
+            new_rows = build_transaction_rows(st.session_state.data_source, df, [transaction])
+            st.session_state.df = pd.concat([df, new_rows], ignore_index=True)
+            if st.session_state.search_index is not None:
+                st.session_state.search_index.append(new_rows)
+            
+            st.success(f"✅ Added to batch ({len(queue)} pending). Save from the sidebar to write them all at once.")
+
+def display_pending_writes():
+    """Sidebar status for queued expenses, retrying automatically after quota errors"""
+    queue = get_write_queue()
+    source = st.session_state.data_source
+    
+    if queue.is_due():
+        flush_pending_writes(queue, source)
+        if queue.next_attempt_at is None:
+            # Retry settled either way; rerun the page so polling stops
+            st.rerun()
+    
+    if not len(queue):
+        return
+    
+    st.subheader("🕓 Pending Expenses")
+    if queue.last_error:
+        st.warning(f"⚠️ {queue.last_error}")
+    
+    if st.button(f"📤 Save {len(queue)} to {source.name}"):
+        flush_pending_writes(queue, source)
+        st.rerun()
+
+def flush_pending_writes(queue, source):
+    """Send the whole queue to the source in one append call"""
+    written = queue.flush(source, list(st.session_state.df.columns))
+    if written:
+        st.toast(f"Saved {written} expenses to {source.name}", icon="✅")
+
+def select_comparison_sides(df, compare_mode, start_date, end_date):
+    """Render sidebar pickers for the two sides of a comparison"""
+    if compare_mode == "Trip" and 'Trip Name' in df.columns:
+        options = df['Trip Name'].dropna().unique().tolist()
+    elif compare_mode == "Year" and 'Date' in df.columns and start_date:
+        options = sorted(df['Date'].dt.year.dropna().astype(int).unique().tolist())
+    elif compare_mode == "Date Range" and start_date and end_date:
+        # Default to comparing the first and second half of the loaded range
+        midpoint = start_date + (end_date - start_date) / 2
+        range_a = st.sidebar.date_input("Side A", value=(start_date, midpoint), key="compare_range_a")
+        range_b = st.sidebar.date_input("Side B", value=(midpoint + timedelta(days=1), end_date), key="compare_range_b")
+        if len(range_a) == 2 and len(range_b) == 2:
+            return range_a, range_b
+        return None
+    else:
+        return None
+    
+    if len(options) < 2:
+        st.sidebar.info(f"Need at least two values to compare by {compare_mode.lower()}")
+        return None
+    
+    side_a = st.sidebar.selectbox("Side A", options=options, index=0, key="compare_side_a")
+    side_b = st.sidebar.selectbox("Side B", options=options, index=1, key="compare_side_b")
+    return side_a, side_b
+
+def display_comparison(processor, dimension, side_a, side_b):
+    """Display side-by-side comparison with per-category deltas"""
+    comparison = processor.get_comparison(dimension, side_a, side_b)
+    if not comparison:
+        st.info("Pick two different sides with data to compare")
+        return
+    
+    label_a, label_b = comparison['labels']
+    totals = comparison['totals']
+    
+    st.subheader(f"⚖️ {label_a} vs {label_b}")
+    
+    metric_specs = [
+        ("💰 Cash Spent", 'Cost', "${:,.2f}", "{:+,.2f}"),
+        ("💎 Point Value", 'Point Cash Value', "${:,.2f}", "{:+,.2f}"),
+        ("🎯 Total Value", 'Total Value', "${:,.2f}", "{:+,.2f}"),
+        ("🧾 Transactions", 'Transactions', "{:,.0f}", "{:+,.0f}")
+    ]
+    
+    st.markdown(f"**{label_a}**")
+    for col, (title, column, fmt, _) in zip(st.columns(len(metric_specs)), metric_specs):
+        with col:
+            st.metric(title, fmt.format(totals.loc[label_a, column]))
+    
+    # Second row shows the change relative to side A
+    st.markdown(f"**{label_b}**")
+    for col, (title, column, fmt, delta_fmt) in zip(st.columns(len(metric_specs)), metric_specs):
+        delta = totals.loc[label_b, column] - totals.loc[label_a, column]
+        with col:
+            st.metric(title, fmt.format(totals.loc[label_b, column]), delta=delta_fmt.format(delta))
+    
+    st.divider()
+    
+    comparison_chart = processor.create_comparison_chart(comparison)
+    if comparison_chart:
+        st.plotly_chart(comparison_chart, use_container_width=True)
+    
+    st.subheader("📋 Category Deltas")
+    st.dataframe(
+        comparison['by_category'].style.format({
+            label_a: "${:,.2f}",
+            label_b: "${:,.2f}",
+            'Delta': "${:+,.2f}",
+            '% Change': "{:+.1f}%"
+        }, na_rep="—"),
+        use_container_width=True
+    )
+
+def display_search_facets(query, result):
+    """Display hit count and category/trip/month facet counts for a search"""
+    st.subheader(f"🔎 Search Results for \"{query}\"")
+    st.caption(f"{result['total']:,} matching transactions before filters")
+    
+    facet_cols = st.columns(len(result['facets']))
+    for col, (name, counts) in zip(facet_cols, result['facets'].items()):
+        with col:
+            if not counts.empty:
+                facet_df = counts.reset_index()
+                facet_df[name] = facet_df[name].astype(str)
+                st.dataframe(facet_df, use_container_width=True, hide_index=True)
+            else:
+                st.info(f"No {name.lower()} matches")
+    
+    st.divider()
 
 def display_dashboard(processor):
     """Display the main dashboard content"""
@@ -324,6 +509,20 @@ def display_dashboard(processor):
     else:
         st.info("No trip data available for comparison chart")
     
+    # Location map (full width)
+    if 'Location' in processor.df.columns:
+        cluster_label = st.radio(
+            "🗺️ Cluster By",
+            options=list(MAP_CLUSTER_SIZES),
+            index=1,
+            horizontal=True
+        )
+        location_map = processor.create_location_map(get_geocoder(), MAP_CLUSTER_SIZES[cluster_label])
+        if location_map:
+            st.plotly_chart(location_map, use_container_width=True)
+        else:
+            st.info("No locations could be matched in the gazetteer for the map")
+    
     st.divider()
     
     # Data tables section
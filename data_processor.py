@@ -1,9 +1,10 @@
 import pandas as pd
-import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import calendar
+
+# Plotly is imported inside the create_*_chart methods: it is the slowest import
+# in the app and only needed once a chart is actually drawn.
+
+# Dimensions the dashboard can compare side by side
+COMPARISON_DIMENSIONS = ['Trip', 'Year', 'Date Range']
 
 class DataProcessor:
     def __init__(self, df):
@@ -105,8 +106,143 @@ class DataProcessor:
         
         return merchant_summary.sort_values('Total Value', ascending=False).head(top_n)
     
+    def get_spending_by_location(self, geocoder, cell_size=1.0):
+        """Get spending clustered onto a lat/lon grid of ``cell_size`` degrees"""
+        if self.df.empty or 'Location' not in self.df.columns:
+            return pd.DataFrame()
+        
+        # Aggregate per distinct place first so only a handful of rows get geocoded and binned
+        places = self.df.groupby('Location').agg(
+            **{
+                'Cost': ('Cost', 'sum'),
+                'Point Cash Value': ('Point Cash Value', 'sum'),
+                'Transactions': ('Cost', 'size')
+            }
+        )
+        places['Total Value'] = places['Cost'] + places['Point Cash Value']
+        places = places.join(geocoder.geocode_many(places.index)).dropna(subset=['Latitude', 'Longitude'])
+        if places.empty:
+            return pd.DataFrame()
+        
+        # Transaction-weighted centroid so a cluster sits near its busiest places
+        places['Weighted Lat'] = places['Latitude'] * places['Transactions']
+        places['Weighted Lon'] = places['Longitude'] * places['Transactions']
+        places = places.sort_values('Total Value', ascending=False).reset_index()
+        
+        clusters = places.groupby([places['Latitude'] // cell_size, places['Longitude'] // cell_size]).agg(
+            **{
+                'Cost': ('Cost', 'sum'),
+                'Point Cash Value': ('Point Cash Value', 'sum'),
+                'Total Value': ('Total Value', 'sum'),
+                'Transactions': ('Transactions', 'sum'),
+                'Weighted Lat': ('Weighted Lat', 'sum'),
+                'Weighted Lon': ('Weighted Lon', 'sum'),
+                'Places': ('Location', lambda names: ", ".join(names.astype(str).head(3)) + (" …" if len(names) > 3 else ""))
+            }
+        )
+        clusters['Latitude'] = clusters['Weighted Lat'] / clusters['Transactions']
+        clusters['Longitude'] = clusters['Weighted Lon'] / clusters['Transactions']
+        
+        clusters = clusters.drop(columns=['Weighted Lat', 'Weighted Lon'])
+        return clusters.sort_values('Total Value', ascending=False).reset_index(drop=True)
+    
+    def get_comparison(self, dimension, side_a, side_b):
+        """Compare two trips, years, or date ranges by category in one grouped pass"""
+        if self.df.empty or 'Category' not in self.df.columns:
+            return {}
+        
+        prepared = self._comparison_rows(dimension, side_a, side_b)
+        if prepared is None:
+            return {}
+        (label_a, label_b), rows, side_keys = prepared
+        
+        aggregations = {
+            'Cost': ('Cost', 'sum'),
+            'Point Spend': ('Point Spend', 'sum'),
+            'Point Cash Value': ('Point Cash Value', 'sum'),
+            'Transactions': ('Cost', 'size')
+        }
+        
+        # Blank categories get their own bucket so no spend drops out of the deltas
+        categories = rows['Category'].fillna('Uncategorized')
+        grouped = rows.groupby([side_keys, categories], observed=True).agg(**aggregations)
+        grouped['Total Value'] = grouped['Cost'] + grouped['Point Cash Value']
+        
+        # Per-side totals straight from the rows, independent of the category grouping
+        totals = rows.groupby(side_keys, observed=False).agg(**aggregations).reindex([label_a, label_b], fill_value=0)
+        totals['Total Value'] = totals['Cost'] + totals['Point Cash Value']
+        
+        wide = grouped['Total Value'].unstack(level=0, fill_value=0).reindex(columns=[label_a, label_b], fill_value=0)
+        counts = grouped['Transactions'].unstack(level=0, fill_value=0).reindex(columns=[label_a, label_b], fill_value=0)
+        
+        by_category = pd.DataFrame({
+            label_a: wide[label_a],
+            label_b: wide[label_b],
+            'Delta': wide[label_b] - wide[label_a],
+            '% Change': ((wide[label_b] - wide[label_a]) / wide[label_a].where(wide[label_a] != 0)) * 100,
+            f'{label_a} Transactions': counts[label_a],
+            f'{label_b} Transactions': counts[label_b]
+        })
+        by_category.index.name = 'Category'
+        
+        return {
+            'dimension': dimension,
+            'labels': (label_a, label_b),
+            'totals': totals,
+            'by_category': by_category.sort_values('Delta', key=abs, ascending=False)
+        }
+    
+    def _comparison_rows(self, dimension, side_a, side_b):
+        """Return the side labels, the rows to aggregate, and each row's side key"""
+        columns = ['Category', 'Cost', 'Point Spend', 'Point Cash Value']
+        
+        if dimension in ('Trip', 'Year'):
+            # Each row belongs to at most one trip/year, so one isin pass selects
+            # both sides and the dimension value itself becomes the side key.
+            if dimension == 'Trip' and 'Trip Name' in self.df.columns:
+                keys = self.df['Trip Name']
+                values = (side_a, side_b)
+            elif dimension == 'Year' and 'Date' in self.df.columns:
+                keys = self.df['Date'].dt.year
+                values = (int(side_a), int(side_b))
+            else:
+                return None
+            
+            labels = (str(values[0]), str(values[1]))
+            if labels[0] == labels[1]:
+                return None
+            
+            in_sides = keys.isin(values)
+            side_keys = pd.Categorical(
+                keys[in_sides].map(dict(zip(values, labels))),
+                categories=list(labels)
+            )
+            return labels, self.df.loc[in_sides, columns], side_keys
+        
+        if dimension == 'Date Range' and 'Date' in self.df.columns:
+            ranges = [(pd.Timestamp(side[0]), pd.Timestamp(side[1])) for side in (side_a, side_b)]
+            labels = tuple(f"{start:%Y-%m-%d} to {end:%Y-%m-%d}" for start, end in ranges)
+            if labels[0] == labels[1]:
+                return None
+            
+            # Date ranges can overlap, so stack each side's rows (shared rows
+            # count for both) and key the stack by side.
+            parts = [
+                self.df.loc[(self.df['Date'] >= start) & (self.df['Date'] <= end), columns]
+                for start, end in ranges
+            ]
+            side_keys = pd.Categorical(
+                [labels[0]] * len(parts[0]) + [labels[1]] * len(parts[1]),
+                categories=list(labels)
+            )
+            return labels, pd.concat(parts, ignore_index=True), side_keys
+        
+        return None
+    
     def create_category_pie_chart(self):
         """Create pie chart for spending by category"""
+        import plotly.express as px
+        
         category_data = self.get_spending_by_category()
         if category_data.empty:
             return None
@@ -137,6 +273,8 @@ class DataProcessor:
     
     def create_monthly_trend_chart(self):
         """Create line chart for monthly spending trends"""
+        import plotly.graph_objects as go
+        
         monthly_data = self.get_monthly_spending()
         if monthly_data.empty:
             return None
@@ -178,6 +316,8 @@ class DataProcessor:
     
     def create_trip_comparison_chart(self):
         """Create bar chart comparing trips"""
+        import plotly.graph_objects as go
+        
         trip_data = self.get_spending_by_trip()
         if trip_data.empty:
             return None
@@ -208,9 +348,107 @@ class DataProcessor:
         
         return fig
     
-    def filter_data(self, start_date=None, end_date=None, categories=None, trips=None):
-        """Filter data based on date range, categories, and trips"""
-        filtered_df = self.df.copy()
+    def create_location_map(self, geocoder, cell_size=1.0):
+        """Create map of spending clustered by location"""
+        import plotly.graph_objects as go
+        
+        location_data = self.get_spending_by_location(geocoder, cell_size)
+        if location_data.empty:
+            return None
+        
+        # Area-proportional bubbles, capped so one huge cluster does not cover the map.
+        # Refunds can make a cluster negative, so only positive totals scale the size.
+        positive_totals = location_data['Total Value'].clip(lower=0)
+        largest_total = positive_totals.max()
+        if largest_total > 0:
+            sizes = (positive_totals / largest_total) ** 0.5 * 40 + 6
+        else:
+            sizes = 12
+        
+        fig = go.Figure(go.Scattergeo(
+            lat=location_data['Latitude'],
+            lon=location_data['Longitude'],
+            text=location_data['Places'],
+            mode='markers',
+            marker=dict(
+                size=sizes,
+                color=location_data['Total Value'],
+                colorscale='Blues',
+                showscale=True,
+                colorbar=dict(title='Total Value ($)'),
+                line=dict(width=1, color='#0b5394'),
+                sizemode='diameter'
+            ),
+            customdata=location_data[['Total Value', 'Transactions']].values,
+            hovertemplate='<b>%{text}</b><br>' +
+                         'Total Value: $%{customdata[0]:,.2f}<br>' +
+                         'Transactions: %{customdata[1]:,}<br>' +
+                         '<extra></extra>'
+        ))
+        
+        fig.update_layout(
+            title="Spending by Location",
+            geo=dict(
+                showland=True,
+                landcolor='#f2f2f2',
+                showcountries=True,
+                countrycolor='#c8c8c8',
+                projection_type='natural earth'
+            ),
+            margin=dict(l=0, r=0, t=40, b=0)
+        )
+        
+        return fig
+    
+    def create_comparison_chart(self, comparison):
+        """Create grouped bar chart comparing two sides by category"""
+        import plotly.graph_objects as go
+        
+        if not comparison or comparison['by_category'].empty:
+            return None
+        
+        label_a, label_b = comparison['labels']
+        by_category = comparison['by_category']
+        
+        fig = go.Figure()
+        
+        fig.add_trace(go.Bar(
+            x=by_category.index,
+            y=by_category[label_a],
+            name=label_a,
+            marker_color='#1f77b4'
+        ))
+        
+        fig.add_trace(go.Bar(
+            x=by_category.index,
+            y=by_category[label_b],
+            name=label_b,
+            marker_color='#ff7f0e',
+            customdata=by_category[['Delta', '% Change']].values,
+            hovertemplate='<b>%{x}</b><br>' +
+                         'Amount: $%{y:,.2f}<br>' +
+                         'Delta: $%{customdata[0]:,.2f}<br>' +
+                         'Change: %{customdata[1]:.1f}%<br>' +
+                         '<extra></extra>'
+        ))
+        
+        fig.update_layout(
+            title=f"{label_a} vs {label_b} by Category",
+            xaxis_title="Category",
+            yaxis_title="Total Value ($)",
+            barmode='group',
+            xaxis_tickangle=-45
+        )
+        
+        return fig
+    
+    def filter_data(self, start_date=None, end_date=None, categories=None, trips=None, rows=None):
+        """Filter data based on date range, categories, trips, and search hit row positions"""
+        # Narrow to search hits first so the remaining filters only scan matching rows.
+        if rows is not None:
+            filtered_df = self.df.take(rows)
+        else:
+            filtered_df = self.df.copy()
         
         # Date filtering
         if start_date and end_date and 'Date' in filtered_df.columns:
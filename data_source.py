@@ -0,0 +1,104 @@
+import os
+from abc import ABC, abstractmethod
+
+import pandas as pd
+import streamlit as st
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+NUMERIC_COLUMNS = ['Cost', 'Point Spend', 'Point Cash Value']
+
+
+class QuotaExceededError(Exception):
+    """Raised when a write is rejected by rate limiting and should be retried later"""
+
+
+class DataSource(ABC):
+    """Base class for anything the dashboard can load travel log rows from.
+
+    Subclasses implement ``load_data`` and run their raw frame through
+    ``clean_data`` so every backend produces the same column types. Sources
+    that set ``supports_writes`` also provide ``append_rows(rows)``, which
+    writes rows (lists of cell values in header order) in a single call.
+    """
+
+    name = "Data Source"
+    supports_writes = False
+
+    @abstractmethod
+    def load_data(self):
+        """Load data and return a cleaned DataFrame, or None on failure"""
+
+    def clean_data(self, df, parse_dates=True):
+        """Clean and process the raw data"""
+        # Sources that clean in chunks parse dates once at the end instead
+        if parse_dates:
+            df = self.parse_dates(df)
+
+        # Convert numeric columns
+        for col in NUMERIC_COLUMNS:
+            if col not in df.columns:
+                continue
+            if pd.api.types.is_numeric_dtype(df[col]):
+                # Typed sources (Parquet, XLSX) skip the string round-trip
+                df[col] = df[col].fillna(0)
+            else:
+                # Remove any currency symbols and convert to numeric
+                df[col] = df[col].astype(str).str.replace('$', '').str.replace(',', '')
+                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+
+        # Remove empty rows
+        df = df.dropna(how='all')
+
+        # Fill empty strings with None for better filtering
+        text_columns = df.select_dtypes(include='object').columns
+        if len(text_columns) > 0:
+            df[text_columns] = df[text_columns].replace('', None)
+
+        return df
+
+    def parse_dates(self, df):
+        """Convert the Date column to datetime, inferring one format for the whole column"""
+        if 'Date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['Date']):
+            df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+        return df
+
+    def refresh_data(self):
+        """Clear cache and reload data"""
+        st.cache_data.clear()
+        return self.load_data()
+
+
+def _get_config_value(key, default=None):
+    """Read a setting from Streamlit secrets, falling back to the environment."""
+    value = os.getenv(key, default)
+    try:
+        value = st.secrets.get(key, value)
+    except Exception:
+        # Streamlit secrets are optional in local development.
+        pass
+    return value
+
+
+def create_data_source():
+    """Build the data source selected by DATA_SOURCE (sheets, csv, xlsx, parquet)"""
+    source_type = str(_get_config_value('DATA_SOURCE', 'sheets')).strip().lower()
+
+    # Backends are imported on demand so a local-file setup never loads gspread.
+    if source_type == 'sheets':
+        from sheets_connector import SheetsConnector
+        return SheetsConnector()
+
+    from local_source import LOCAL_SOURCES
+    if source_type not in LOCAL_SOURCES:
+        st.error(f"❌ Unknown DATA_SOURCE '{source_type}'. Use one of: sheets, {', '.join(LOCAL_SOURCES)}.")
+        return None
+
+    path = _get_config_value('DATA_SOURCE_PATH')
+    if not path:
+        st.error(f"❌ DATA_SOURCE_PATH must be set to load a local {source_type} file.")
+        return None
+
+    return LOCAL_SOURCES[source_type](path)
@@ -0,0 +1,134 @@
+import json
+import os
+import threading
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from json_file import write_json_atomic
+
+# Load environment variables
+load_dotenv()
+
+# Bump when lookup rules change so cached results from older rules are discarded
+CACHE_VERSION = 2
+
+
+class Geocoder:
+    """Resolve free-text locations to coordinates using a local gazetteer file.
+
+    Every distinct place is looked up once and the result (including misses)
+    is persisted to a JSON cache, so later runs never touch the gazetteer
+    unless a new place shows up or the gazetteer file itself changes. One
+    instance is shared by all dashboard sessions, so cache access is locked.
+    """
+
+    def __init__(self, gazetteer_path=None, cache_path=None):
+        self.gazetteer_path = gazetteer_path or os.getenv('GAZETTEER_PATH', 'gazetteer.csv')
+        self.cache_path = cache_path or os.getenv('GEOCODE_CACHE_PATH', '.geocode_cache.json')
+        self._gazetteer = None
+        self._countries = set()
+        self._lock = threading.Lock()
+        self._cache = self._load_cache()
+
+    def geocode_many(self, locations):
+        """Return Latitude/Longitude for each location, NaN where it could not be resolved"""
+        keys = {location: self._normalize(location) for location in locations}
+
+        # Sessions run on separate threads; hold the lock from miss detection
+        # through the save so the cache is never mutated while being written.
+        with self._lock:
+            misses = {key for key in keys.values() if key not in self._cache}
+            if misses:
+                gazetteer = self._load_gazetteer()
+                for key in misses:
+                    self._cache[key] = self._lookup(gazetteer, self._countries, key)
+                self._save_cache()
+
+            rows = []
+            for location, key in keys.items():
+                coords = self._cache.get(key)
+                rows.append(coords if coords else (float('nan'), float('nan')))
+
+        return pd.DataFrame(rows, index=pd.Index(list(keys), name='Location'), columns=['Latitude', 'Longitude'])
+
+    @staticmethod
+    def _normalize(location):
+        """Lowercase and collapse whitespace so spelling variants share a cache entry"""
+        return " ".join(str(location).lower().split())
+
+    @staticmethod
+    def _lookup(gazetteer, countries, key):
+        """Try 'city, ..., country', then 'city, country', then just 'city'"""
+        candidates = [key]
+        if ',' in key:
+            parts = [part.strip() for part in key.split(',') if part.strip()]
+            if parts:
+                candidates.append(f"{parts[0]}, {parts[-1]}")
+                # A known country rules out same-named cities elsewhere; states
+                # and other qualifiers still fall back to the bare city name.
+                if parts[-1] not in countries:
+                    candidates.append(parts[0])
+
+        for candidate in candidates:
+            if candidate in gazetteer:
+                return gazetteer[candidate]
+        return None
+
+    def _gazetteer_signature(self):
+        """Identify the gazetteer file version so a changed file invalidates the cache"""
+        try:
+            stat = os.stat(self.gazetteer_path)
+        except OSError:
+            return None
+        return f"{os.path.abspath(self.gazetteer_path)}:{stat.st_size}:{int(stat.st_mtime)}"
+
+    def _load_gazetteer(self):
+        """Load name -> (latitude, longitude) from the gazetteer CSV on first miss"""
+        if self._gazetteer is not None:
+            return self._gazetteer
+
+        self._gazetteer = {}
+        if not os.path.exists(self.gazetteer_path):
+            return self._gazetteer
+
+        places = pd.read_csv(self.gazetteer_path).dropna(subset=['name', 'latitude', 'longitude'])
+        names = places['name'].astype(str).str.lower().str.split().str.join(" ")
+        coords = list(zip(places['latitude'].astype(float), places['longitude'].astype(float)))
+
+        # Rows are expected in order of prominence, so the first entry wins for ambiguous names.
+        if 'country' in places.columns:
+            countries = places['country'].fillna('').astype(str).str.lower().str.strip()
+            for name, country, point in zip(names, countries, coords):
+                if country:
+                    self._gazetteer.setdefault(f"{name}, {country}", point)
+                    self._countries.add(country)
+        for name, point in zip(names, coords):
+            self._gazetteer.setdefault(name, point)
+
+        return self._gazetteer
+
+    def _load_cache(self):
+        """Read the persistent cache, discarding it if the gazetteer has changed"""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        if cached.get('version') != CACHE_VERSION or cached.get('gazetteer') != self._gazetteer_signature():
+            return {}
+        return {key: tuple(value) if value else None for key, value in cached.get('places', {}).items()}
+
+    def _save_cache(self):
+        """Write the cache atomically so readers and other processes never see a partial file"""
+        payload = {
+            'version': CACHE_VERSION,
+            'gazetteer': self._gazetteer_signature(),
+            'places': {key: list(value) if value else None for key, value in self._cache.items()}
+        }
+        try:
+            write_json_atomic(self.cache_path, payload)
+        except OSError:
+            # A read-only deployment still works, it just re-resolves places per process.
+            pass
@@ -0,0 +1,21 @@
+import json
+import os
+import tempfile
+
+
+def write_json_atomic(path, payload):
+    """Write JSON through a unique temp file and rename it into place.
+
+    Readers and concurrent writers never see a partial file. The temp file is
+    removed if anything fails, and the error is re-raised.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f"{os.path.basename(path)}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,90 @@
+import os
+from abc import abstractmethod
+
+import pandas as pd
+import streamlit as st
+
+from data_source import DataSource, _get_config_value
+
+# Rows per chunk when streaming a CSV through the cleaning pipeline
+CSV_CHUNK_ROWS = 200_000
+
+
+class LocalFileSource(DataSource):
+    """Load the travel log from a file on disk instead of Google Sheets"""
+
+    name = "Local File"
+
+    def __init__(self, path):
+        self.path = path
+
+    @abstractmethod
+    def read_file(self):
+        """Read the file into a cleaned DataFrame"""
+
+    def load_data(self):
+        """Load data from the local file and return as DataFrame"""
+        if not os.path.exists(self.path):
+            st.error(f"❌ Data file '{self.path}' not found. Check DATA_SOURCE_PATH.")
+            return None
+
+        try:
+            df = self.read_file()
+        except Exception as e:
+            st.error(f"❌ Error loading data from '{self.path}': {str(e)}")
+            return None
+
+        if df.empty:
+            st.warning("⚠️ No data found in the file.")
+        return df
+
+
+class CsvSource(LocalFileSource):
+    """CSV export of the travel log sheet"""
+
+    name = "Local CSV"
+
+    def read_file(self):
+        # Clean chunk by chunk so string intermediates never cover the whole file at once.
+        # Dates are parsed after the concat so the inferred format doesn't depend on
+        # where the chunks happen to split.
+        chunks = pd.read_csv(self.path, chunksize=CSV_CHUNK_ROWS, memory_map=True, skipinitialspace=True)
+        frames = [self.clean_data(chunk, parse_dates=False) for chunk in chunks]
+        if not frames:
+            return pd.DataFrame()
+        return self.parse_dates(pd.concat(frames, ignore_index=True))
+
+
+class ExcelSource(LocalFileSource):
+    """XLSX download of the travel log sheet"""
+
+    name = "Local Excel"
+
+    def __init__(self, path, sheet_name=None):
+        super().__init__(path)
+        self.sheet_name = sheet_name or _get_config_value('WORKSHEET_NAME', 'Raw Data')
+
+    def read_file(self):
+        with pd.ExcelFile(self.path, engine='openpyxl') as workbook:
+            # A Sheets download keeps the worksheet name; other workbooks use their first sheet
+            sheet_name = self.sheet_name if self.sheet_name in workbook.sheet_names else 0
+            df = workbook.parse(sheet_name)
+        return self.clean_data(df).reset_index(drop=True)
+
+
+class ParquetSource(LocalFileSource):
+    """Typed Parquet snapshot, the fastest way to load the travel log"""
+
+    name = "Local Parquet"
+
+    def read_file(self):
+        # Memory-map the file and skip the string cleanup for already-typed columns
+        df = pd.read_parquet(self.path, engine='pyarrow', memory_map=True)
+        return self.clean_data(df).reset_index(drop=True)
+
+
+LOCAL_SOURCES = {
+    'csv': CsvSource,
+    'xlsx': ExcelSource,
+    'parquet': ParquetSource
+}
@@ -0,0 +1,281 @@
+import bisect
+import re
+
+import numpy as np
+import pandas as pd
+
+# Words are lowercased before matching, so this covers letters, digits and accents.
+TOKEN_PATTERN = r"\w+"
+
+FACET_NAMES = ['Category', 'Trip Name', 'Month']
+
+# Prefix expansions kept around so the next keystroke doesn't rebuild them
+TERM_CACHE_SIZE = 64
+
+
+class SearchIndex:
+    """In-memory inverted index over the free-text columns of the travel log.
+
+    Postings map each lowercased word to the sorted row positions that contain
+    it, so a query only touches the rows for its own words instead of scanning
+    every column. Facet codes are kept alongside so category, trip and month
+    counts for a hit set come from a single ``bincount`` each. Rows appended
+    after a build are kept in a small tail index that queries merge in, so
+    adding an expense doesn't re-lay out the whole index.
+    """
+
+    def __init__(self, df=None):
+        self.text_columns = []
+        self._postings = {}
+        self._vocab = []
+        self._row_hashes = np.empty(0, dtype=np.uint64)
+        self._facet_lookup = {}
+        self._facet_codes = {}
+        self._term_cache = {}
+        self._flat_postings = None
+        self._tail_postings = {}
+        self._tail_vocab = []
+        if df is not None:
+            self.build(df)
+        else:
+            self._rebuild_flat()
+
+    def __len__(self):
+        return len(self._row_hashes)
+
+    def build(self, df):
+        """Index a dataset from scratch"""
+        self.text_columns = self._find_text_columns(df)
+        self._postings = {}
+        self._vocab = []
+        self._row_hashes = np.empty(0, dtype=np.uint64)
+        self._facet_lookup = {name: {} for name in FACET_NAMES}
+        self._facet_codes = {name: np.empty(0, dtype=np.int64) for name in FACET_NAMES}
+        self._flat_postings = None
+        self._append(df, self._hash_rows(df))
+        self._rebuild_flat()
+
+    def sync(self, df):
+        """Bring the index up to date with a reloaded dataset.
+
+        New expenses are appended at the bottom of the sheet, so when the rows
+        already indexed are unchanged only the new tail is tokenized. Any other
+        edit (reordering, changed cells, new columns) falls back to a rebuild.
+        Returns the number of rows that had to be tokenized.
+        """
+        indexed = len(self)
+        hashes = self._hash_rows(df)
+
+        if (
+            indexed
+            and len(df) >= indexed
+            and self._find_text_columns(df) == self.text_columns
+            and np.array_equal(hashes[:indexed], self._row_hashes)
+        ):
+            self._append(df.iloc[indexed:], hashes[indexed:])
+            # A reload is a good point to fold the tail back into the flat layout
+            self._rebuild_flat()
+            return len(df) - indexed
+
+        self.build(df)
+        return len(df)
+
+    def append(self, df):
+        """Index rows added to the end of the dataset without rehashing the rest"""
+        self._append(df, self._hash_rows(df))
+
+    def search(self, query):
+        """Return matching row positions plus category, trip and month facet counts.
+
+        Every word in the query must match (AND). Each query word matches indexed
+        words that start with it, so partial words work while typing.
+        """
+        terms = set(re.findall(TOKEN_PATTERN, str(query).lower()))
+
+        if terms:
+            # Start from the most selective term and probe the rest with binary
+            # search, so the cost follows the smallest hit set, not the largest.
+            matches = sorted((self._match_term(term) for term in terms), key=len)
+            rows = matches[0]
+            for other in matches[1:]:
+                if len(rows) == 0 or len(other) == 0:
+                    rows = rows[:0]
+                    break
+                slots = np.minimum(np.searchsorted(other, rows), len(other) - 1)
+                rows = rows[other[slots] == rows]
+        else:
+            rows = np.arange(len(self))
+
+        return {
+            'rows': rows,
+            'total': len(rows),
+            'facets': self._facet_counts(rows)
+        }
+
+    def _match_term(self, term):
+        """Return the sorted rows of every indexed word starting with ``term``"""
+        cached = self._term_cache.get(term)
+        if cached is not None:
+            return cached
+
+        upper = term[:-1] + chr(ord(term[-1]) + 1)
+        start = bisect.bisect_left(self._vocab, term)
+        end = bisect.bisect_left(self._vocab, upper)
+        tail_words = self._tail_vocab[bisect.bisect_left(self._tail_vocab, term):bisect.bisect_left(self._tail_vocab, upper)]
+
+        words = set(self._vocab[start:min(end, start + 2)]) | set(tail_words[:2])
+        if not words:
+            return np.empty(0, dtype=np.int64)
+        if len(words) == 1:
+            return self._postings[words.pop()]
+
+        # Short prefixes expand to thousands of words. Their postings sit next to
+        # each other in vocabulary order, so mark that one slice in a row mask
+        # instead of concatenating and sorting per-word arrays.
+        flat_rows, offsets = self._flat_postings
+        mask = np.zeros(len(self), dtype=bool)
+        mask[flat_rows[offsets[start]:offsets[end]]] = True
+        for word in tail_words:
+            mask[self._tail_postings[word]] = True
+        rows = np.flatnonzero(mask)
+
+        if len(self._term_cache) >= TERM_CACHE_SIZE:
+            self._term_cache.pop(next(iter(self._term_cache)))
+        self._term_cache[term] = rows
+        return rows
+
+    def _rebuild_flat(self):
+        """Concatenate all postings in vocabulary order and empty the tail index"""
+        self._vocab = sorted(self._postings)
+        postings = [self._postings[word] for word in self._vocab]
+        offsets = np.zeros(len(postings) + 1, dtype=np.int64)
+        np.cumsum([len(rows) for rows in postings], out=offsets[1:])
+        flat_rows = np.concatenate(postings) if postings else np.empty(0, dtype=np.int64)
+        self._flat_postings = (flat_rows, offsets)
+        self._tail_postings = {}
+        self._tail_vocab = []
+        self._term_cache = {}
+
+    def _facet_counts(self, rows):
+        """Count hits per category, trip and month"""
+        facets = {}
+        for name in FACET_NAMES:
+            codes = self._facet_codes[name][rows]
+            labels = list(self._facet_lookup[name])
+            counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+
+            facet = pd.Series(counts, index=pd.Index(labels, name=name), name='Matches')
+            facet = facet[facet > 0]
+            if name == 'Month':
+                facet = facet.sort_index()
+            else:
+                facet = facet.sort_values(ascending=False)
+            facets[name] = facet
+
+        return facets
+
+    def _append(self, df, hashes):
+        """Add rows to the end of the index"""
+        self._term_cache = {}
+        offset = len(self)
+        positions = np.arange(offset, offset + len(df))
+
+        token_parts = []
+        for column in self.text_columns:
+            # Merchants, trips and locations repeat a lot, so tokenize each
+            # distinct value once and fan the words back out to its rows.
+            value_codes, values = pd.factorize(df[column])
+            words = pd.Series(values).astype(str).str.lower().str.findall(TOKEN_PATTERN).explode().dropna()
+            cells = pd.DataFrame({'value': value_codes, 'row': positions})
+            pairs = cells.merge(
+                pd.DataFrame({'value': words.index, 'word': words.to_numpy()}),
+                on='value'
+            )
+            token_parts.append(pd.Series(pairs['word'].to_numpy(), index=pairs['row'].to_numpy()))
+
+        if token_parts:
+            self._add_postings(pd.concat(token_parts))
+
+        for name, values in self._facet_values(df).items():
+            self._facet_codes[name] = np.concatenate([
+                self._facet_codes[name],
+                self._encode_facet(name, values)
+            ])
+
+        self._row_hashes = np.concatenate([self._row_hashes, hashes])
+
+    def _add_postings(self, tokens):
+        """Merge a Series of words (indexed by row position) into the postings"""
+        if tokens.empty:
+            return
+
+        codes, words = pd.factorize(tokens.to_numpy())
+        positions = tokens.index.to_numpy(dtype=np.int64)
+
+        # Sort by (word, row) and drop repeats of a word within the same row.
+        order = np.lexsort((positions, codes))
+        codes, positions = codes[order], positions[order]
+        keep = np.ones(len(codes), dtype=bool)
+        keep[1:] = (codes[1:] != codes[:-1]) | (positions[1:] != positions[:-1])
+        codes, positions = codes[keep], positions[keep]
+
+        # New rows always sit after the indexed ones, so appending keeps postings sorted.
+        # During a build the flat layout is redone afterwards; otherwise the rows
+        # also go into the tail index so queries see them without a rebuild.
+        track_tail = self._flat_postings is not None
+        bounds = np.flatnonzero(np.diff(codes)) + 1
+        for word, rows in zip(words, np.split(positions, bounds)):
+            existing = self._postings.get(word)
+            self._postings[word] = rows if existing is None else np.concatenate([existing, rows])
+
+            if track_tail:
+                tail = self._tail_postings.get(word)
+                if tail is None:
+                    self._tail_postings[word] = rows
+                    bisect.insort(self._tail_vocab, word)
+                else:
+                    self._tail_postings[word] = np.concatenate([tail, rows])
+
+    def _encode_facet(self, name, values):
+        """Map facet labels to stable integer codes, -1 for missing values"""
+        local_codes, uniques = pd.factorize(values)
+        lookup = self._facet_lookup[name]
+
+        mapping = np.empty(len(uniques) + 1, dtype=np.int64)
+        for idx, label in enumerate(uniques):
+            mapping[idx] = lookup.setdefault(label, len(lookup))
+        # factorize marks missing values as -1, which picks the last slot.
+        mapping[-1] = -1
+
+        return mapping[local_codes]
+
+    @staticmethod
+    def _facet_values(df):
+        """Return the raw values each facet is counted over"""
+        missing = pd.Series([None] * len(df), index=df.index, dtype=object)
+
+        if 'Date' in df.columns and pd.api.types.is_datetime64_any_dtype(df['Date']):
+            months = df['Date'].dt.to_period('M')
+        else:
+            months = missing
+
+        return {
+            'Category': df['Category'] if 'Category' in df.columns else missing,
+            'Trip Name': df['Trip Name'] if 'Trip Name' in df.columns else missing,
+            'Month': months
+        }
+
+    @staticmethod
+    def _find_text_columns(df):
+        """Free-text columns are everything that is still text after cleaning"""
+        return [
+            column for column in df.columns
+            if pd.api.types.is_object_dtype(df[column]) or pd.api.types.is_string_dtype(df[column])
+        ]
+
+    @staticmethod
+    def _hash_rows(df):
+        """Fingerprint each row so unchanged prefixes can be detected on sync"""
+        if df.empty:
+            return np.empty(0, dtype=np.uint64)
+        return pd.util.hash_pandas_object(df, index=False).to_numpy()
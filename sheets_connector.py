@@ -1,14 +1,16 @@
-import gspread
-from google.oauth2.service_account import Credentials
 import pandas as pd
 import streamlit as st
 import os
 from dotenv import load_dotenv
+from data_source import DataSource, QuotaExceededError, _get_config_value
 
 # Load environment variables
 load_dotenv()
 
-class SheetsConnector:
+class SheetsConnector(DataSource):
+    name = "Google Sheets"
+    supports_writes = True
+
     def __init__(self):
         self.gc = None
         self.sheet = None
@@ -16,16 +18,8 @@ class SheetsConnector:
 
     def _get_sheet_config(self):
         """Resolve sheet and worksheet names from secrets or environment."""
-        sheet_name = os.getenv('GOOGLE_SHEET_NAME', 'Travel Log')
-        worksheet_name = os.getenv('WORKSHEET_NAME', 'Raw Data')
-
-        try:
-            sheet_name = st.secrets.get('GOOGLE_SHEET_NAME', sheet_name)
-            worksheet_name = st.secrets.get('WORKSHEET_NAME', worksheet_name)
-        except Exception:
-            # Streamlit secrets are optional in local development.
-            pass
-
+        sheet_name = _get_config_value('GOOGLE_SHEET_NAME', 'Travel Log')
+        worksheet_name = _get_config_value('WORKSHEET_NAME', 'Raw Data')
         return sheet_name, worksheet_name
 
     def _make_unique_headers(self, headers):
@@ -50,6 +44,10 @@ class SheetsConnector:
         
     def connect_to_sheets(_self):
         """Connect to Google Sheets using service account credentials"""
+        # The Google client stack is imported on first fetch to keep it out of cold start
+        import gspread
+        from google.oauth2.service_account import Credentials
+
         sheet_name, worksheet_name = _self._get_sheet_config()
 
         try:
@@ -162,29 +160,18 @@ class SheetsConnector:
             st.error(f"❌ Error loading data: {str(e)}")
             return None
     
-    def clean_data(self, df):
-        """Clean and process the raw data"""
-        # Convert Date column to datetime
-        if 'Date' in df.columns:
-            df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    def append_rows(self, rows):
+        """Append rows to the worksheet in one API call, reusing the loaded connection"""
+        import gspread
         
-        # Convert numeric columns
-        numeric_columns = ['Cost', 'Point Spend', 'Point Cash Value']
-        for col in numeric_columns:
-            if col in df.columns:
-                # Remove any currency symbols and convert to numeric
-                df[col] = df[col].astype(str).str.replace('$', '').str.replace(',', '')
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        worksheet = self.worksheet or self.connect_to_sheets()
+        if worksheet is None:
+            raise RuntimeError("Could not connect to a valid worksheet.")
         
-        # Remove empty rows
-        df = df.dropna(how='all')
-        
-        # Fill empty strings with None for better filtering
-        df = df.replace('', None)
-        
-        return df
-    
-    def refresh_data(self):
-        """Clear cache and reload data"""
-        st.cache_data.clear()
-        return self.load_data()
\ No newline at end of file
+        try:
+            # USER_ENTERED lets Sheets parse dates and numbers like typed input
+            worksheet.append_rows(rows, value_input_option='USER_ENTERED', table_range='A1')
+        except gspread.exceptions.APIError as e:
+            if e.response is not None and e.response.status_code == 429:
+                raise QuotaExceededError(str(e)) from e
+            raise
@@ -0,0 +1,120 @@
+import json
+import os
+import random
+import threading
+import time
+from datetime import date, datetime
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from data_source import QuotaExceededError
+from json_file import write_json_atomic
+
+# Load environment variables
+load_dotenv()
+
+# Quota retries back off 2s, 4s, 8s, ... up to two minutes between attempts
+RETRY_BASE_SECONDS = 2
+RETRY_MAX_SECONDS = 120
+
+
+class WriteQueue:
+    """Local queue of new transactions waiting to be written to the data source.
+
+    Transactions are collected here and sent together in one ``append_rows``
+    call. When the write is rate limited the batch stays queued and
+    ``next_attempt_at`` is pushed out with exponential backoff. The pending
+    batch is mirrored to a JSON file so a refresh, closed tab or server
+    restart doesn't lose entered expenses. One instance is shared by all
+    sessions, so queue changes and flushes are locked.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv('PENDING_WRITES_PATH', '.pending_writes.json')
+        self.attempts = 0
+        self.next_attempt_at = None
+        self.last_error = None
+        self._lock = threading.Lock()
+        self.pending = self._load_pending()
+
+    def __len__(self):
+        return len(self.pending)
+
+    def add(self, transaction):
+        """Queue a transaction given as a dict of column name -> value"""
+        # Store sheet-ready values so the queue file is plain JSON
+        row = {column: self._format_cell(value) for column, value in transaction.items()}
+        with self._lock:
+            self.pending.append(row)
+            self._save_pending()
+
+    def is_due(self, now=None):
+        """True when a backed-off retry is scheduled and its delay has passed"""
+        if not self.pending or self.next_attempt_at is None:
+            return False
+        return (now or time.time()) >= self.next_attempt_at
+
+    def flush(self, source, headers):
+        """Write every pending transaction in one call and return how many were written"""
+        # Held across the API call so two sessions can't send the same batch
+        with self._lock:
+            if not self.pending:
+                return 0
+
+            batch = list(self.pending)
+            rows = [[self._format_cell(transaction.get(header)) for header in headers] for transaction in batch]
+
+            try:
+                source.append_rows(rows)
+            except QuotaExceededError as e:
+                self.attempts += 1
+                delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (self.attempts - 1))
+                # Jitter so several open sessions don't retry in lockstep
+                self.next_attempt_at = time.time() + delay * random.uniform(0.8, 1.2)
+                self.last_error = f"Quota exceeded, retrying in {delay:.0f}s: {e}"
+                return 0
+            except Exception as e:
+                # Not a rate limit, so retrying on a timer won't help; wait for the user.
+                self.next_attempt_at = None
+                self.last_error = str(e)
+                return 0
+
+            self.pending = self.pending[len(batch):]
+            self.attempts = 0
+            self.next_attempt_at = None
+            self.last_error = None
+            self._save_pending()
+            return len(batch)
+
+    def _load_pending(self):
+        """Read transactions left over from a previous run"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                pending = json.load(f)
+        except (OSError, ValueError):
+            return []
+        return pending if isinstance(pending, list) else []
+
+    def _save_pending(self):
+        """Write the pending batch atomically so a crash never leaves a partial file"""
+        try:
+            if self.pending:
+                write_json_atomic(self.path, self.pending)
+            elif os.path.exists(self.path):
+                os.remove(self.path)
+        except OSError as e:
+            # Still queued in memory; surface it so the user saves before closing the tab
+            self.last_error = f"Could not save pending expenses to {self.path}: {e}"
+
+    @staticmethod
+    def _format_cell(value):
+        """Convert a Python/pandas value into something the Sheets API accepts"""
+        if value is None or (not isinstance(value, str) and pd.isna(value)):
+            return ""
+        if isinstance(value, (datetime, date)):
+            return value.strftime('%Y-%m-%d')
+        if hasattr(value, 'item'):
+            # numpy scalars are not JSON serializable
+            return value.item()
+        return value